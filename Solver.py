@@ -1,6 +1,8 @@
+import copy
 import ctypes
 import os
 import sys
+import threading
 
 # --- 1. C++ STRUCTURE DEFINITIONS ---
 
@@ -23,9 +25,44 @@ class parResults(ctypes.Structure):
         ("parContractsString", (ctypes.c_char * 128) * 2)
     ]
 
+# Batch structures for CalcAllTables (sizes from dll.h)
+DDS_STRAINS = 5
+MAXNOOFTABLES = 40
+
+class ddTableDeals(ctypes.Structure):
+    _fields_ = [
+        ("noOfTables", ctypes.c_int),
+        ("deals", ddTableDeal * (MAXNOOFTABLES * DDS_STRAINS))
+    ]
+
+class ddTablesRes(ctypes.Structure):
+    _fields_ = [
+        ("noOfBoards", ctypes.c_int),
+        ("results", ddTableResults * (MAXNOOFTABLES * DDS_STRAINS))
+    ]
+
+class allParResults(ctypes.Structure):
+    _fields_ = [("presults", parResults * MAXNOOFTABLES)]
+
+# Strain names for display, indexed like resTable (Polish names kept for display)
+STRAIN_NAMES = ("Pik", "Kier", "Karo", "Trefl", "NT")
+# Display Order: NT(4), S(0), H(1), D(2), C(3)
+DISPLAY_ORDER = (4, 0, 1, 2, 3)
+VUL_NAMES = ("None", "NS", "EW", "Both")
+
+# Vulnerability for boards 1-16 (0 = None, 1 = NS, 2 = EW, 3 = Both)
+# 1:None, 2:NS, 3:EW, 4:Both, 5:NS, 6:EW, 7:Both, 8:None... itd.
+_VUL_PATTERN = bytes((0, 1, 2, 3, 1, 2, 3, 0, 2, 3, 0, 1, 3, 0, 1, 2))
+
+# One player's block of the packed deal (4 suits x 32-bit lanes)
+_PLAYER_MASK = (1 << 128) - 1
+
 # --- 2. SOLVER CLASS ---
 
 class BridgeSolver:
+    # Maximum number of memoized solve() results (oldest entries are evicted first)
+    CACHE_SIZE = 256
+
     def __init__(self, library_path="./libdds.so"):
         # Check if the library file exists
         if not os.path.exists(library_path):
@@ -52,8 +89,16 @@ class BridgeSolver:
         self.lib.Par.argtypes = [ctypes.POINTER(ddTableResults), ctypes.POINTER(parResults), ctypes.c_int]
         self.lib.Par.restype = ctypes.c_int
 
-        # Initialize threads (0 = auto-detect hardware concurrency)
-        self.lib.SetMaxThreads(0)
+        # CalcAllTables(ddTableDeals *dealsp, int mode, int trumpFilter[5], ddTablesRes *resp, allParResults *presp)
+        self.lib.CalcAllTables.argtypes = [
+            ctypes.POINTER(ddTableDeals), ctypes.c_int, ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ddTablesRes), ctypes.POINTER(allParResults)
+        ]
+        self.lib.CalcAllTables.restype = ctypes.c_int
+
+        # libdds.so initializes itself when loaded (library constructor). SetMaxThreads is
+        # applied again lazily on the first solve in each process (see _ensure_threads),
+        # so forked server workers get their own setting, with DDS_THREADS honoured.
 
         # --- Mappings ---
         # Suit Order in DDS: Spades=0, Hearts=1, Diamonds=2, Clubs=3
@@ -67,6 +112,68 @@ class BridgeSolver:
             'T': 1<<10, 'J': 1<<11, 'Q': 1<<12, 'K': 1<<13, 'A': 1<<14
         }
 
+        # Flat card lookup: 'AS' -> (suit_idx, rank_bit), every letter case included
+        self.CARDS = {}
+        for rank_char, bit in self.RankMap.items():
+            for suit_char, suit_idx in self.SuitMap.items():
+                for r in (rank_char, rank_char.lower()):
+                    for s in (suit_char, suit_char.lower()):
+                        self.CARDS[r + s] = (suit_idx, bit)
+
+        # Per-player card bits pre-shifted into their 32-bit lane of the packed deal
+        # (lane = Player*4 + Suit), so a whole deal is built by OR-ing plain ints.
+        # The packed int is serialized in native byte order; on big-endian hosts that
+        # puts the high lanes first, so lanes are numbered from the top there.
+        lane_order = range(16) if sys.byteorder == 'little' else range(15, -1, -1)
+        self.DEAL_BITS = {
+            player: {card: bit << (32 * lane_order[p_idx * 4 + suit_idx]) for card, (suit_idx, bit) in self.CARDS.items()}
+            for player, p_idx in self.HandMap.items()
+        }
+
+        # --- Cached bindings (avoid attribute lookups on every solve) ---
+        self._CalcDDtable = self.lib.CalcDDtable
+        self._Par = self.lib.Par
+        self._CalcAllTables = self.lib.CalcAllTables
+        self._byref = ctypes.byref
+        self._DEAL_BITS_get = self.DEAL_BITS.get
+
+        # Memoized solve() results: (packed deal, vulnerability) -> result_data
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+        # Last packed hands passed with a version: (hands_dict, hands_version, packed)
+        self._last_packed = None
+
+        # CDLL releases the GIL for the duration of each foreign call, so other Flask
+        # requests keep running while DDS works. DDS itself is not reentrant, so calls
+        # into the library are serialized (DDS parallelizes internally via SetMaxThreads).
+        self._lock = threading.Lock()
+
+        # PID of the process in which SetMaxThreads was last applied
+        self._threads_pid = None
+
+        # Preallocated ctypes structures, reused across solves. Every DDS call already
+        # runs under self._lock, so one set per solver is enough - only touch them
+        # while holding the lock.
+        self._deal = ddTableDeal()
+        self._table = ddTableResults()
+        self._pres = parResults()
+        self._deals = ddTableDeals()
+        self._tables = ddTablesRes()
+        self._all_pres = allParResults()
+
+    def _ensure_threads(self):
+        """
+        Helper: Applies SetMaxThreads once per process, on the first solve after
+        loading or after a fork (call with self._lock held).
+        """
+        pid = os.getpid()
+        if self._threads_pid != pid:
+            # 0 = auto-detect hardware concurrency.
+            # DDS_THREADS caps it when several server workers share the machine.
+            self.lib.SetMaxThreads(int(os.environ.get("DDS_THREADS", 0)))
+            self._threads_pid = pid
+
     def _format_contract(self, raw_bytes_array):
         """
         Helper: Extracts string from ctypes array and removes 'NS:' or 'EW:' prefixes.
@@ -83,196 +190,327 @@ class BridgeSolver:
         Determine vulnerability based on the round number (Standard Bridge 16-board cycle).
         Mapping: 0 = None, 1 = NS, 2 = EW, 3 = Both
         """
-        # Sekwencja założeń dla rozdań 1-16:
-        # 1:None, 2:NS, 3:EW, 4:Both, 5:NS, 6:EW, 7:Both, 8:None... itd.
-        vul_pattern = [0, 1, 2, 3, 1, 2, 3, 0, 2, 3, 0, 1, 3, 0, 1, 2]
-    
-        # Zwraca wartość dla danego rozdania (modulo 16 obsługuje rozdania > 16)
-        return vul_pattern[(round - 1) % 16]
+        # Zwraca wartość dla danego rozdania (& 15 == modulo 16, obsługuje rozdania > 16)
+        return _VUL_PATTERN[(round - 1) & 15]
 
-    def solve_debug_console(self, hands_dict, round):
+    def _reset_results(self):
         """
-        Main function to solve the deal.
-        Input: hands_dict = {'N': ['AS', 'KS'...], 'E': [...], ...}
+        Helper: Zeroes the shared table/pres structures before reuse (call with self._lock held).
+        The deal structures are always overwritten, so they are not cleared.
         """
-        deal = ddTableDeal()
+        ctypes.memset(ctypes.addressof(self._table), 0, ctypes.sizeof(ddTableResults))
+        ctypes.memset(ctypes.addressof(self._pres), 0, ctypes.sizeof(parResults))
 
-        # 1. Convert Python List -> C++ Bitmasks
-        total_cards = 0
+    def _pack_hands(self, hands_dict):
+        """
+        Helper: Converts hands_dict = {'N': ['AS', 'KS'...], ...} into one int holding
+        the 16 deal bitmasks as 32-bit lanes [Player*4 + Suit].
+        Every card is one set bit in its holder's block, so packed.bit_count() counts
+        distinct (player, card) pairs - see _deal_error() for the full validation.
+        """
+        packed = 0
         for player, cards in hands_dict.items():
-            if player not in self.HandMap: continue
-            p_idx = self.HandMap[player]
+            bits = self._DEAL_BITS_get(player)
+            if bits is None: continue
+            bits_get = bits.get
 
             for card in cards:
-                if len(card) < 2: continue
-                
                 # Input format expected: 'AS' -> Rank='A', Suit='S'
-                rank_char = card[0].upper()
-                suit_char = card[1].upper()
+                card_bits = bits_get(card) or bits_get(card[:2])
 
-                if rank_char in self.RankMap and suit_char in self.SuitMap:
-                    bit = self.RankMap[rank_char]
-                    suit_idx = self.SuitMap[suit_char]
-                    
+                if card_bits:
                     # Apply bitwise OR to add the card to the hand
-                    deal.cards[p_idx][suit_idx] |= bit
-                    total_cards += 1
+                    packed |= card_bits
 
-        # Validation
+        return packed
+
+    def _deal_error(self, packed):
+        """
+        Helper: Returns an error message unless the packed deal holds exactly 52 cards,
+        each of them held by a single player. Returns None for a valid deal.
+        """
+        total_cards = packed.bit_count()
         if total_cards != 52:
-            print(f"WARNING: Input contains {total_cards} cards instead of 52! Results may be invalid.")
+            return f"Invalid card count: {total_cards}"
 
-        # 2. Calculate Double Dummy Table
-        table = ddTableResults()
-        res = self.lib.CalcDDtable(deal, ctypes.byref(table))
+        # OR of the four player blocks: a card held by two players is counted once here
+        distinct = (packed | packed >> 128 | packed >> 256 | packed >> 384) & _PLAYER_MASK
+        if distinct.bit_count() != 52:
+            return f"Duplicate cards across hands: {52 - distinct.bit_count()}"
+        return None
+
+    def _load_deal(self, deal, packed):
+        """
+        Helper: Copies a packed deal into a ddTableDeal structure.
+        """
+        # 16 native-endian uint32 lanes == unsigned int cards[4][4]
+        size = ctypes.sizeof(ddTableDeal)
+        ctypes.memmove(ctypes.addressof(deal), packed.to_bytes(size, sys.byteorder), size)
+
+    def _empty_result(self):
+        """
+        Helper: Default response structure returned by solve() on failure.
+        """
+        return {
+            "status": "error",
+            "message": "",
+            "dd_table": {},
+            "par_result": {
+                "vulnerability": "Unknown",
+                "optimal_contract": "-",
+                "score": "0"
+            }
+        }
+
+    def _fill_result(self, result_data, table, pres, vul_val):
+        """
+        Helper: Runs Par on a solved DD table and fills result_data with the final answer.
+        Reads the shared ctypes structures, so call with self._lock held.
+        """
+        # Obliczenia PAR (Par)
+        vuln_str = VUL_NAMES[vul_val]
+
+        res_par = self._Par(self._byref(table), self._byref(pres), vul_val)
+
+        contract = "-"
+        score = "0"
+
+        if res_par == 1:
+            # --- KLUCZOWA POPRAWKA ---
+            # Używamy .value, aby pobrać ciąg bajtów z tablicy C do null-terminatora
+            try:
+                # pres.parContractsString to tablica c_char, .value zwraca bytes
+                contract = self._format_contract(pres.parContractsString[0])
+                score = pres.parScore[0].value.decode('utf-8')
+            except Exception as decode_err:
+                contract = f"Decode Error: {decode_err}"
+        else:
+            result_data["message"] = f"DDS Par Error: {res_par}"
+
+        # Budowanie ostatecznej odpowiedzi
+        # Jedno kopiowanie całej tabeli [Strain*4 + Player] zamiast 20 odczytów przez ctypes
+        flat = list((ctypes.c_int * 20).from_address(ctypes.addressof(table.resTable)))
+
+        structured_dd = {}
+        for s_idx in DISPLAY_ORDER:
+            suit_name = STRAIN_NAMES[s_idx]
+            base = s_idx * 4
+            structured_dd[suit_name] = {
+                "N": flat[base],
+                "E": flat[base + 1],
+                "S": flat[base + 2],
+                "W": flat[base + 3],
+            }
+
+        # Sukces - nadpisujemy dane
+        result_data["status"] = "ok"
+        result_data["dd_table"] = structured_dd
+        result_data["par_result"] = {
+            "vulnerability": vuln_str,
+            "optimal_contract": contract,
+            "score": score
+        }
+
+    def _store(self, cache_key, result_data):
+        """
+        Helper: Remembers a successful result, evicting the oldest entry when full.
+        Results carrying a message (Par or decode errors) are not cached.
+        """
+        if result_data["message"]:
+            return
+        entry = copy.deepcopy(result_data)
+        # Eviction and insert happen under a lock, since request threads share the cache
+        with self._cache_lock:
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache), None), None)
+            self._cache[cache_key] = entry
+
+    def solve_debug_console(self, hands_dict, round):
+        """
+        Main function to solve the deal.
+        Input: hands_dict = {'N': ['AS', 'KS'...], 'E': [...], ...}
+        """
+        # 1. Convert Python List -> C++ Bitmasks
+        packed = self._pack_hands(hands_dict)
+
+        # Validation
+        deal_error = self._deal_error(packed)
+        if deal_error:
+            print(f"WARNING: {deal_error}! Results may be invalid.")
+
+        vulnerability = self.get_vulnerability(round) # 0=none, 1=NS, 2=EW, 3=both
+        vuln_str = VUL_NAMES[vulnerability]
+
+        # 2. Calculate Double Dummy Table and PAR on the shared structures
+        with self._lock:
+            self._ensure_threads()
+            self._load_deal(self._deal, packed)
+            self._reset_results()
+            res = self._CalcDDtable(self._deal, self._byref(self._table))
+
+            if res == 1:
+                # Copy the whole table once, flat index = Strain*4 + Player
+                flat = list((ctypes.c_int * 20).from_address(ctypes.addressof(self._table.resTable)))
+                res_par = self._Par(self._byref(self._table), self._byref(self._pres), vulnerability)
+                if res_par == 1:
+                    # FIX: Added .value to access bytes before decoding
+                    contract = self._format_contract(self._pres.parContractsString[0])
+                    score = self._pres.parScore[0].value.decode('utf-8')
 
         if res != 1:
             print(f"DDS Calculation Error, code: {res}")
             return
 
-        # 3. Display DD Table
-        print("\n--- Double Dummy Analysis ---")
-        print("-------------------------------------------------")
-        print("|  Strain  | North | South |  East |  West  |")
-        print("|----------+-------+-------+-------+--------|")
-        
-        suits_str = ["Pik", "Kier", "Karo", "Trefl", "NT"] # Polish names kept for display
-        # Display Order: NT(4), S(0), H(1), D(2), C(3)
-        display_order = [4, 0, 1, 2, 3]
+        # 3. Display DD Table (rows are collected and written to stdout in one call)
+        lines = [
+            "\n--- Double Dummy Analysis ---",
+            "-------------------------------------------------",
+            "|  Strain  | North | South |  East |  West  |",
+            "|----------+-------+-------+-------+--------|",
+        ]
 
-        for s_idx in display_order:
-            row_name = suits_str[s_idx] if s_idx < 5 else "?"
+        for s_idx in DISPLAY_ORDER:
+            row_name = STRAIN_NAMES[s_idx]
             
             # Retrieve tricks for each player
-            val_n = table.resTable[s_idx][0]
-            val_e = table.resTable[s_idx][1]
-            val_s = table.resTable[s_idx][2]
-            val_w = table.resTable[s_idx][3]
+            val_n, val_e, val_s, val_w = flat[s_idx * 4:s_idx * 4 + 4]
             
             # Format output table
-            print(f"| {row_name:<8} |   {val_n:2}  |   {val_s:2}  |   {val_e:2}  |   {val_w:2}  |")
+            lines.append(f"| {row_name:<8} |   {val_n:2}  |   {val_s:2}  |   {val_e:2}  |   {val_w:2}  |")
         
-        print("-------------------------------------------------")
+        lines.append("-------------------------------------------------")
+        sys.stdout.write("\n".join(lines) + "\n")
 
-        # 4. Calculate PAR (Min-Max Score)
-        pres = parResults()
-        vulnerability = self.vulnerability(round) # 0=none, 1=NS, 2=EW, 3=both
-        vuln_str = ["None", "NS", "EW", "Both"][vulnerability]
-
-        res = self.lib.Par(ctypes.byref(table), ctypes.byref(pres), vulnerability)
-
-        if res == 1:
-            # FIX: Added .value to access bytes before decoding
-            contract = self._format_contract(pres.parContractsString[0])
-            score = pres.parScore[0].value.decode('utf-8')
-            
+        # 4. PAR (Min-Max Score)
+        if res_par == 1:
             print("\n=== PAR RESULT (MIN-MAX) ===")
             print(f"vulnerability: {vuln_str}")
             print(f"Optimal Contract: {contract}")
             print(f"Score:            {score}")
         else:
-            print(f"PAR Calculation Error, code: {res}")
+            print(f"PAR Calculation Error, code: {res_par}")
 
 
 
-    def solve(self, hands_dict, round_num):
+    def solve(self, hands_dict, round_num, hands_version=None):
         """
         Main function to solve the deal.
+        hands_version: optional counter the caller bumps whenever hands_dict is modified;
+        with it, re-solving the same (unchanged) dict skips card parsing.
         Returns a consistent dictionary structure regardless of success or failure.
         """
         # 1. Inicjalizacja domyślnej struktury odpowiedzi
-        result_data = {
-            "status": "error",
-            "message": "",
-            "dd_table": {},
-            "par_result": {
-                "vulnerability": "Unknown",
-                "optimal_contract": "-",
-                "score": "0"
-            }
-        }
+        result_data = self._empty_result()
 
         try:
-            deal = ddTableDeal()
-            # Inicjalizacja macierzy zerami
-            deal.cards = ((ctypes.c_uint * 4) * 4)() 
+            # Pobieramy vulnerability (0-3) używając poprawionej wcześniej metody
+            vul_val = self.get_vulnerability(round_num)
 
             # 2. Konwersja Python List -> C++ Bitmasks
-            total_cards = 0
-            for player, cards in hands_dict.items():
-                if player not in self.HandMap: continue
-                p_idx = self.HandMap[player]
-
-                for card in cards:
-                    if len(card) < 2: continue
-                    rank_char = card[0].upper()
-                    suit_char = card[1].upper()
-
-                    if rank_char in self.RankMap and suit_char in self.SuitMap:
-                        bit = self.RankMap[rank_char]
-                        suit_idx = self.SuitMap[suit_char]
-                        deal.cards[p_idx][suit_idx] |= bit
-                        total_cards += 1
-
-            if total_cards != 52:
-                result_data["message"] = f"Invalid card count: {total_cards}"
+            # Ten sam słownik w tej samej wersji - używamy poprzednio spakowanego rozdania
+            last = self._last_packed
+            if hands_version is not None and last is not None and last[0] is hands_dict and last[1] == hands_version:
+                packed = last[2]
+            else:
+                packed = self._pack_hands(hands_dict)
+                if hands_version is not None:
+                    self._last_packed = (hands_dict, hands_version, packed)
+
+            deal_error = self._deal_error(packed)
+            if deal_error:
+                result_data["message"] = deal_error
                 return result_data
 
-            # 3. Obliczenia Double Dummy (CalcDDtable)
-            table = ddTableResults()
-            res_dd = self.lib.CalcDDtable(deal, ctypes.byref(table))
+            # DDS jest deterministyczny - to samo rozdanie przy tych samych założeniach
+            # daje ten sam wynik, więc zwracamy kopię zapamiętanej odpowiedzi.
+            # Spakowane rozdanie jest kluczem niezależnym od kolejności kart.
+            cache_key = (packed, vul_val)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+            # 3. Obliczenia Double Dummy (CalcDDtable) i PAR na współdzielonych buforach
+            with self._lock:
+                self._ensure_threads()
+                self._load_deal(self._deal, packed)
+                self._reset_results()
+                res_dd = self._CalcDDtable(self._deal, self._byref(self._table))
+
+                if res_dd == 1:
+                    # 4. PAR i budowanie odpowiedzi
+                    self._fill_result(result_data, self._table, self._pres, vul_val)
 
             if res_dd != 1:
                 result_data["message"] = f"DDS CalcDDtable Error: {res_dd}"
                 return result_data
 
-            # 4. Obliczenia PAR (Par)
-            pres = parResults()
-            # Pobieramy vulnerability (0-3) używając poprawionej wcześniej metody
-            vul_val = self.get_vulnerability(round_num) 
-            vuln_str = ["None", "NS", "EW", "Both"][vul_val]
-
-            res_par = self.lib.Par(ctypes.byref(table), ctypes.byref(pres), vul_val)
-
-            contract = "-"
-            score = "0"
-
-            if res_par == 1:
-                # --- KLUCZOWA POPRAWKA ---
-                # Używamy .value, aby pobrać ciąg bajtów z tablicy C do null-terminatora
-                try:
-                    # pres.parContractsString to tablica c_char, .value zwraca bytes
-                    contract = self._format_contract(pres.parContractsString[0])
-                    score = pres.parScore[0].value.decode('utf-8')
-                except Exception as decode_err:
-                    contract = f"Decode Error: {decode_err}"
-            else:
-                result_data["message"] = f"DDS Par Error: {res_par}"
-
-            # 5. Budowanie ostatecznej odpowiedzi
-            suits_str = ["Pik", "Kier", "Karo", "Trefl", "NT"]
-            display_order = [4, 0, 1, 2, 3] # NT, S, H, D, C
-
-            structured_dd = {}
-            for s_idx in display_order:
-                suit_name = suits_str[s_idx]
-                structured_dd[suit_name] = {
-                    "N": table.resTable[s_idx][0],
-                    "E": table.resTable[s_idx][1],
-                    "S": table.resTable[s_idx][2],
-                    "W": table.resTable[s_idx][3],
-                }
-
-            # Sukces - nadpisujemy dane
-            result_data["status"] = "ok"
-            result_data["dd_table"] = structured_dd
-            result_data["par_result"] = {
-                "vulnerability": vuln_str,
-                "optimal_contract": contract,
-                "score": score
-            }
+            self._store(cache_key, result_data)
 
         except Exception as e:
             result_data["message"] = f"Python Exception: {str(e)}"
         
-        return result_data
\ No newline at end of file
+        return result_data
+
+    def solve_many(self, hands_list, rounds):
+        """
+        Solves several deals at once, up to MAXNOOFTABLES per CalcAllTables call.
+        Input: hands_list = [hands_dict, ...], rounds = [round_num, ...] (same length)
+        Returns a list of dictionaries in the same format as solve().
+        """
+        results = []
+        pending = [] # (result_data, cache_key, vul_val, packed) do policzenia w DDS
+
+        for hands_dict, round_num in zip(hands_list, rounds):
+            result_data = self._empty_result()
+            try:
+                vul_val = self.get_vulnerability(round_num)
+                packed = self._pack_hands(hands_dict)
+                deal_error = self._deal_error(packed)
+                if deal_error:
+                    result_data["message"] = deal_error
+                else:
+                    cache_key = (packed, vul_val)
+                    cached = self._cache.get(cache_key)
+                    if cached is not None:
+                        results.append(copy.deepcopy(cached))
+                        continue
+                    pending.append((result_data, cache_key, vul_val, packed))
+            except Exception as e:
+                result_data["message"] = f"Python Exception: {str(e)}"
+            results.append(result_data)
+
+        # Wszystkie miana (filtr zerowy), bez PAR w DDS (mode = -1) - Par liczymy
+        # osobno, bo każde rozdanie może mieć inne założenia
+        trump_filter = (ctypes.c_int * DDS_STRAINS)()
+
+        # Współdzielone struktury wsadowe - DDS nadpisuje pierwsze noOfTables
+        # wpisów, więc nie trzeba ich zerować
+        deals, tables = self._deals, self._tables
+
+        for start in range(0, len(pending), MAXNOOFTABLES):
+            chunk = pending[start:start + MAXNOOFTABLES]
+
+            with self._lock:
+                self._ensure_threads()
+                deals.noOfTables = len(chunk)
+                for i, (_, _, _, packed) in enumerate(chunk):
+                    self._load_deal(deals.deals[i], packed)
+
+                res_dd = self._CalcAllTables(self._byref(deals), -1, trump_filter,
+                                             self._byref(tables), self._byref(self._all_pres))
+
+                for i, (result_data, _, vul_val, _) in enumerate(chunk):
+                    if res_dd != 1:
+                        result_data["message"] = f"DDS CalcAllTables Error: {res_dd}"
+                        continue
+                    try:
+                        ctypes.memset(ctypes.addressof(self._pres), 0, ctypes.sizeof(parResults))
+                        self._fill_result(result_data, tables.results[i], self._pres, vul_val)
+                    except Exception as e:
+                        result_data["message"] = f"Python Exception: {str(e)}"
+
+            for result_data, cache_key, _, _ in chunk:
+                if result_data["status"] == "ok":
+                    self._store(cache_key, result_data)
+
+        return results
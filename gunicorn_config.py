@@ -0,0 +1,17 @@
+# Gunicorn settings: gunicorn -c gunicorn_config.py wsgi:application
+import os
+
+bind = "0.0.0.0:5000"
+
+# A few processes, each with threads for the lightweight endpoints (lobby polling,
+# history) while a solve is running. DDS calls are serialized per process.
+workers = 2
+threads = 4
+worker_class = "gthread"
+
+# Load the app (and libdds.so) once in the master so workers share its pages
+preload_app = True
+
+# DDS starts its own thread pool in every worker; split the cores between workers
+# to avoid oversubscription (applied by BridgeSolver on the first solve in each worker).
+os.environ.setdefault("DDS_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
@@ -1,6 +1,7 @@
 from flask import Flask, jsonify, render_template, request, redirect, url_for
 import sys
 import subprocess
+import collections
 import datetime
 import uuid  # Do generowania unikalnego ID historii
 
@@ -11,8 +12,12 @@ app = Flask(__name__)
 
 # --- BAZA DANYCH (W PAMIĘCI) ---
 TABLE_STATE = {"N": None, "S": None, "E": None, "W": None}
-GLOBAL_CONFIG = {"round": 1}
-HISTORY_LOG = [] # Tutaj będziemy zapisywać wyniki z unikalnym ID
+GLOBAL_CONFIG = {"round": 1, "hands_version": 0} # hands_version: zwiększać przy każdej zmianie CURRENT_HANDS
+HISTORY_LIMIT = 1000
+HISTORY_LOG = collections.deque(maxlen=HISTORY_LIMIT) # Tutaj będziemy zapisywać wyniki z unikalnym ID
+HISTORY_INDEX = {} # id -> wpis z HISTORY_LOG (szybka edycja)
+USER_TO_SEAT = {} # Odwrotna mapa IP -> miejsce (utrzymywana razem z TABLE_STATE)
+_LOBBY_CACHE = {} # (rozdanie % 16) -> (dealer, vulnerability)
 
 CURRENT_HANDS = {
     'N': ['AS', 'KS', 'QS', 'JS', 'TS', '9S', '8S', '7S', '6S', '5S', '4S', '3S', '2S'],
@@ -47,6 +52,8 @@ def get_hands_api():
 
 @app.route('/history')
 def history():
+    # Kopia (jedno wywołanie w C) - iterowanie deque w szablonie przerwałby
+    # zapis nowego wyniku z innego wątku
     return render_template('history.html', history=list(reversed(HISTORY_LOG)))
 
 @app.route('/settings')
@@ -62,31 +69,25 @@ def help_page():
 @app.route('/api/lobby_status', methods=['GET'])
 def get_lobby_status():
     user_ip = request.remote_addr
-    seats_info = {}
-    seats_filled_count = 0
-    
-    for seat, occupant_ip in TABLE_STATE.items():
-        if occupant_ip is None:
-            seats_info[seat] = "free"
-        elif occupant_ip == user_ip:
-            seats_info[seat] = "mine"
-            seats_filled_count += 1
-        elif occupant_ip == "DEV_BOT":
-            seats_info[seat] = "taken"
-            seats_filled_count += 1
-        else:
-            seats_info[seat] = "taken"
-            seats_filled_count += 1
-
-    ready = (seats_filled_count == 4)
+    seats_info = {
+        seat: "free" if occupant_ip is None else "mine" if occupant_ip == user_ip else "taken"
+        for seat, occupant_ip in TABLE_STATE.items()
+    }
+
+    ready = None not in TABLE_STATE.values()
     current_round = GLOBAL_CONFIG["round"]
-    
-    dealer_map = ["N", "E", "S", "W"]
-    dealer = dealer_map[(current_round - 1) % 4]
-    
-    vul_code = bridge_solver.get_vulnerability(current_round)
-    vul_map = {0: "None", 1: "NS", 2: "EW", 3: "Both"}
-    vulnerability = vul_map.get(vul_code, "None")
+
+    # Dealer i założenia powtarzają się co 16 rozdań
+    board = (current_round - 1) % 16
+    lobby = _LOBBY_CACHE.get(board)
+    if lobby is None:
+        dealer_map = ["N", "E", "S", "W"]
+        dealer = dealer_map[board % 4]
+
+        vul_code = bridge_solver.get_vulnerability(current_round)
+        vul_map = {0: "None", 1: "NS", 2: "EW", 3: "Both"}
+        lobby = _LOBBY_CACHE[board] = (dealer, vul_map.get(vul_code, "None"))
+    dealer, vulnerability = lobby
 
     return jsonify({
         "seats": seats_info,
@@ -105,12 +106,14 @@ def toggle_seat(seat):
     
     if current == user_ip:
         TABLE_STATE[seat] = None
+        USER_TO_SEAT.pop(user_ip, None)
         return jsonify({"status": "ok"})
     
     if current is None:
-        for s, occ in TABLE_STATE.items():
-            if occ == user_ip: TABLE_STATE[s] = None
+        previous = USER_TO_SEAT.get(user_ip)
+        if previous is not None: TABLE_STATE[previous] = None
         TABLE_STATE[seat] = user_ip
+        USER_TO_SEAT[user_ip] = seat
         return jsonify({"status": "ok"})
 
     return jsonify({"status": "busy"})
@@ -135,6 +138,7 @@ def dev_fill_seats():
 def dev_clear_seats():
     for seat in TABLE_STATE:
         TABLE_STATE[seat] = None
+    USER_TO_SEAT.clear()
     return jsonify({"status": "ok"})
 
 @app.route('/api/dev/shutdown', methods=['POST'])
@@ -156,7 +160,7 @@ def solve_api():
         bid_contract = data.get("bid_contract", "none")
         
         # Wywołanie solvera
-        result = bridge_solver.solve(CURRENT_HANDS, current_round)
+        result = bridge_solver.solve(CURRENT_HANDS, current_round, GLOBAL_CONFIG["hands_version"])
         
         # Zapis do historii
         if result.get("status") == "ok":
@@ -168,7 +172,11 @@ def solve_api():
                 "score": result.get("par_result", {}).get("score", "N/A"),
                 "bid_contract": bid_contract
             }
+            # Najstarszy wpis wypada z kolejki - usuwamy go też z indeksu
+            if len(HISTORY_LOG) == HISTORY_LIMIT:
+                HISTORY_INDEX.pop(HISTORY_LOG[0]["id"], None)
             HISTORY_LOG.append(entry)
+            HISTORY_INDEX[entry["id"]] = entry
             
         return jsonify(result)
 
@@ -179,6 +187,38 @@ def solve_api():
             "message": f"Błąd po stronie serwera: {str(e)}"
         }), 500
 
+@app.route('/api/solve_batch', methods=['POST'])
+def solve_batch_api():
+    """
+    Liczy wiele rozdań jednym wywołaniem DDS.
+    Oczekuje listy: [{"hands": {"N": [...], ...}, "round": 1}, ...]
+    Brakujące pola zastępowane są bieżącym rozdaniem i rundą.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            return jsonify({"status": "error", "message": "Expected a JSON list of deals"}), 400
+
+        hands_list = []
+        rounds = []
+        for i, item in enumerate(data):
+            # Błędne dane od klienta to 400, nie błąd serwera
+            if not isinstance(item, dict) or not isinstance(item.get("hands", CURRENT_HANDS), dict):
+                return jsonify({"status": "error", "message": f"Deal {i}: expected an object with a 'hands' object"}), 400
+            try:
+                rounds.append(int(item.get("round", GLOBAL_CONFIG["round"])))
+            except (ValueError, TypeError):
+                return jsonify({"status": "error", "message": f"Deal {i}: invalid round"}), 400
+            hands_list.append(item.get("hands", CURRENT_HANDS))
+
+        return jsonify(bridge_solver.solve_many(hands_list, rounds))
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Błąd po stronie serwera: {str(e)}"
+        }), 500
+
 @app.route('/api/edit_history/<entry_id>', methods=['POST'])
 def edit_history(entry_id):
     """
@@ -189,15 +229,16 @@ def edit_history(entry_id):
     new_round = data.get("round")
     new_bid_contract = data.get("bid_contract")
 
-    for entry in HISTORY_LOG:
-        if entry["id"] == entry_id:
-            if new_round is not None:
-                entry["round"] = int(new_round)
-            if new_bid_contract is not None:
-                entry["bid_contract"] = str(new_bid_contract)
-            return jsonify({"status": "ok", "entry": entry})
+    entry = HISTORY_INDEX.get(entry_id)
+    if entry is not None:
+        if new_round is not None:
+            entry["round"] = int(new_round)
+        if new_bid_contract is not None:
+            entry["bid_contract"] = str(new_bid_contract)
+        return jsonify({"status": "ok", "entry": entry})
             
     return jsonify({"status": "error", "message": "History entry not found"}), 404
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # threaded=True: solve requests (GIL released inside DDS) don't block lobby polling
+    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
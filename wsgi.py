@@ -0,0 +1,3 @@
+# WSGI entry point for production servers, e.g.:
+#   gunicorn -c gunicorn_config.py wsgi:application
+from main import app as application